@@ -3,11 +3,10 @@ import random
 import os
 from io import BytesIO
 from datetime import datetime
-from collections import deque
 
 from PIL import Image
 
-from utils import gemini_client
+from utils import gemini_client, sprite_frames, sprite_variants
 
 
 LEGACY_STATUS_TRANSLATIONS = {
@@ -56,7 +55,7 @@ class Pet:
             f"a 16 bit sprite-sheet like a tamagochi of a {self.animal_type} face with 6 frames "
             "and black background"
         )
-        image_bytes = gemini_client.generate_image(prompt)
+        image_bytes = gemini_client.generate_image(prompt, priority=gemini_client.Priority.INTERACTIVE)
 
         image = Image.open(BytesIO(image_bytes))
         next_file_number = self.get_pet_number("assets/pet_animations")
@@ -69,54 +68,16 @@ class Pet:
     def generate_atlas_file(self, image_number: int):
         image_path = os.path.abspath(f"assets/pet_animations/pet_{image_number}.png")
 
-        with Image.open(image_path).convert("L") as grayscale:
-            width, height = grayscale.size
-            pixels = grayscale.load()
-            mask = [[pixels[x, y] > 20 for x in range(width)] for y in range(height)]
+        with Image.open(image_path) as image:
+            height = image.height
+            frames = sprite_frames.detect_frames(image)
 
-        visited = [[False] * width for _ in range(height)]
         components = []
-        for y in range(height):
-            for x in range(width):
-                if not mask[y][x] or visited[y][x]:
-                    continue
-                queue = deque([(x, y)])
-                visited[y][x] = True
-                min_x = max_x = x
-                min_y = max_y = y
-                pixel_count = 0
-                while queue:
-                    cx, cy = queue.popleft()
-                    pixel_count += 1
-                    if cx < min_x:
-                        min_x = cx
-                    if cx > max_x:
-                        max_x = cx
-                    if cy < min_y:
-                        min_y = cy
-                    if cy > max_y:
-                        max_y = cy
-                    for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
-                        nx, ny = cx + dx, cy + dy
-                        if 0 <= nx < width and 0 <= ny < height and mask[ny][nx] and not visited[ny][nx]:
-                            visited[ny][nx] = True
-                            queue.append((nx, ny))
-
-                component_width = max_x - min_x + 1
-                component_height = max_y - min_y + 1
-                bounding_area = component_width * component_height
-                if 25000 < bounding_area < 230000:
-                    atlas_y = height - (min_y + component_height)
-                    components.append(
-                        {
-                            "x": min_x,
-                            "y": atlas_y,
-                            "w": component_width,
-                            "h": component_height,
-                        }
-                    )
-
-        components.sort(key=lambda item: item["x"])
+        for left, top, right, bottom in frames:
+            component_height = bottom - top
+            # The atlas measures rows from the bottom of the image.
+            atlas_y = height - (top + component_height)
+            components.append({"x": left, "y": atlas_y, "w": right - left, "h": component_height})
 
         data_dict = {image_path: {}}
         for idx, comp in enumerate(components, start=1):
@@ -241,7 +202,11 @@ class Pet:
             f"say something when your owner {action}. Respond in a {self.characteristics[0].lower()} tone."
         )
 
-        reaction = gemini_client.generate_text(reaction_prompt)
+        reaction = gemini_client.generate_text(
+            reaction_prompt,
+            priority=gemini_client.Priority.CARE,
+            pet_id=self.get_usage_key(),
+        )
         self.chat_history += f"Your pet reacted: {reaction}\n"
         self.save_info(self.chat_history)
         return reaction
@@ -287,5 +252,14 @@ class Pet:
     def get_image_path(self):
         return f'assets/pet_animations/pet_{self.image}.png'
 
+    def get_mood_image_path(self):
+        mood = sprite_variants.mood_for_statuses(self.status)
+        if mood is None:
+            return self.get_image_path()
+        return sprite_variants.derive_variant(self.image, mood)
+
+    def get_usage_key(self):
+        return f'pet_{self.image}'
+
     def get_prompt(self):
         return self.prompt
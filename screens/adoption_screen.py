@@ -7,6 +7,7 @@ from rich.prompt import Prompt
 from rich.table import Table
 
 from models.pet import Pet
+from utils import gemini_client
 
 
 class AdoptionScreen:
@@ -18,7 +19,15 @@ class AdoptionScreen:
     def choose_pet(self) -> Optional[Pet]:
         """Return an adopted pet or ``None`` if the user cancels."""
         while True:
-            pet = Pet(name="no_name", health=100, hunger=10, emotion="happy")
+            try:
+                pet = Pet(name="no_name", health=100, hunger=10, emotion="happy")
+            except gemini_client.QuotaExceededError:
+                self.console.print("[red]No new pets can be drawn right now.[/]")
+                retry = Prompt.ask("Try again?", choices=["retry", "leave"], default="retry")
+                if retry == "retry":
+                    continue
+                self.console.print("[yellow]Adoption cancelled.[/]")
+                return None
             self._render_pet_preview(pet)
             action = Prompt.ask(
                 "Do you want to adopt this pet?",
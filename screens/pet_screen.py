@@ -50,21 +50,30 @@ class PetScreen:
         table.add_row("Hunger", str(self.pet.hunger))
         table.add_row("Emotion", self.pet.emotion)
         table.add_row("Status", ", ".join(self.pet.status) if self.pet.status else "Normal")
+        try:
+            table.add_row("Sprite", self.pet.get_mood_image_path())
+        except OSError:
+            pass
         self.console.print(table)
 
     def _handle_feed(self) -> None:
         self.pet.feed()
-        reaction = self.pet.generate_reaction("feeds you")
-        self.console.print(f"[green]Pet:[/] {reaction}")
+        self._show_reaction("feeds you")
 
     def _handle_injection(self) -> None:
         self.pet.give_injection()
-        reaction = self.pet.generate_reaction("gives you an injection")
-        self.console.print(f"[green]Pet:[/] {reaction}")
+        self._show_reaction("gives you an injection")
 
     def _handle_play(self) -> None:
         self.pet.play()
-        reaction = self.pet.generate_reaction("plays with you")
+        self._show_reaction("plays with you")
+
+    def _show_reaction(self, action: str) -> None:
+        try:
+            reaction = self.pet.generate_reaction(action)
+        except gemini_client.QuotaExceededError:
+            self.console.print("[yellow]Your pet is too tired to react right now.[/]")
+            return
         self.console.print(f"[green]Pet:[/] {reaction}")
 
     def _handle_chat(self) -> None:
@@ -72,18 +81,32 @@ class PetScreen:
         if not user_input.strip():
             self.console.print("[yellow]No message sent.[/]")
             return
-        history_was_empty = not (self.pet.chat_history or "").strip()
-        self._append_chat_history(f"You: {user_input}\n")
-        if history_was_empty:
-            combined_prompt = f"{self.pet.generate_prompt()}\n{self.pet.chat_history}".strip()
+        history = self.pet.chat_history or ""
+        user_line = f"You: {user_input}\n"
+        # The history is only extended once the pet answers, so a shed call leaves it untouched.
+        if not history.strip():
+            combined_prompt = f"{self.pet.generate_prompt()}\n{history}{user_line}".strip()
         else:
-            combined_prompt = self.pet.chat_history
-        response = gemini_client.generate_text(combined_prompt)
+            combined_prompt = f"{history}{user_line}"
+        try:
+            response = gemini_client.generate_text(
+                combined_prompt,
+                priority=gemini_client.Priority.INTERACTIVE,
+                pet_id=self.pet.get_usage_key(),
+                on_wait=self._notify_wait,
+            )
+        except gemini_client.QuotaExceededError:
+            self.console.print("[yellow]Your pet is out of energy to talk right now. Try again later.[/]")
+            return
+        self._append_chat_history(user_line)
         self._append_chat_history(f"Pet: {response}\n")
         self.console.print(f"[green]Pet:[/] {response}")
         self.pet.last_chat_time = datetime.now()
         self.pet.save_info(self.pet.chat_history)
 
+    def _notify_wait(self, seconds: float) -> None:
+        self.console.print(f"[cyan]Your pet is catching its breath, answering in about {seconds:.0f}s...[/]")
+
     def _append_chat_history(self, text: str) -> None:
         if self.pet.chat_history is None:
             self.pet.chat_history = ""
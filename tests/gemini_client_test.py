@@ -0,0 +1,62 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from utils import gemini_client
+from utils.scheduler import Budget, ModelScheduler, Priority, QuotaExceededError
+from utils.usage import UsageTracker
+
+
+class TestGeminiClient(unittest.TestCase):
+    def setUp(self):
+        self.tracker = UsageTracker(path=None)
+        self.client = MagicMock()
+        patchers = [
+            patch.object(gemini_client, 'get_client', return_value=self.client),
+            patch.object(gemini_client, '_usage_tracker', self.tracker),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.use_scheduler(ModelScheduler(self.tracker))
+
+    def use_scheduler(self, scheduler):
+        patcher = patch.object(gemini_client, '_scheduler', scheduler)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_generate_text_records_usage_metadata(self):
+        self.client.models.generate_content.return_value = SimpleNamespace(
+            text=' Hello! ',
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=11, candidates_token_count=4, total_token_count=15),
+        )
+
+        text = gemini_client.generate_text('Hi', pet_id='pet_1')
+
+        self.assertEqual(text, 'Hello!')
+        expected = {'calls': 1, 'prompt_tokens': 11, 'output_tokens': 4, 'total_tokens': 15, 'images': 0}
+        self.assertEqual(self.tracker.for_model(gemini_client.TEXT_MODEL), expected)
+        self.assertEqual(self.tracker.for_pet('pet_1'), expected)
+
+    def test_generate_image_records_image_count(self):
+        image = SimpleNamespace(image=SimpleNamespace(image_bytes=b'png'))
+        self.client.models.generate_images.return_value = SimpleNamespace(generated_images=[image])
+
+        self.assertEqual(gemini_client.generate_image('a pet', pet_id='pet_2'), b'png')
+
+        self.assertEqual(self.tracker.for_model(gemini_client.IMAGE_MODEL)['images'], 1)
+        self.assertEqual(self.tracker.today('pet_2')['images'], 1)
+
+    def test_shed_call_does_not_reach_client(self):
+        self.use_scheduler(ModelScheduler(self.tracker, global_budget=Budget(images_per_day=0)))
+
+        with self.assertRaises(QuotaExceededError):
+            gemini_client.generate_image('a pet', priority=Priority.BACKGROUND)
+
+        self.client.models.generate_images.assert_not_called()
+        self.assertEqual(self.tracker.totals()['calls'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from utils.scheduler import Budget, ModelScheduler, Priority, QuotaExceededError
+from utils.usage import UsageTracker
+
+
+class TestUsageTracker(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'usage_stats.json')
+        self.tracker = UsageTracker(self.path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_record_response_aggregates_per_pet_and_model(self):
+        response = SimpleNamespace(usage_metadata=SimpleNamespace(
+            prompt_token_count=12, candidates_token_count=8, total_token_count=20))
+        self.tracker.record_response('text-model', response, pet_id='pet_1')
+        self.tracker.record('image-model', pet_id='pet_2', images=1)
+
+        self.assertEqual(self.tracker.totals()['calls'], 2)
+        self.assertEqual(self.tracker.for_pet('pet_1')['total_tokens'], 20)
+        self.assertEqual(self.tracker.for_model('image-model')['images'], 1)
+        self.assertEqual(self.tracker.today('pet_2')['images'], 1)
+
+    def test_record_response_without_metadata(self):
+        self.tracker.record_response('text-model', SimpleNamespace(usage_metadata=None))
+        self.assertEqual(self.tracker.totals()['calls'], 1)
+        self.assertEqual(self.tracker.totals()['total_tokens'], 0)
+
+    def test_usage_is_persisted(self):
+        self.tracker.record('text-model', pet_id='pet_1', prompt_tokens=5, output_tokens=5)
+        reloaded = UsageTracker(self.path)
+        self.assertEqual(reloaded.for_pet('pet_1')['total_tokens'], 10)
+        self.assertEqual(reloaded.today()['calls'], 1)
+
+    def test_save_failure_does_not_raise(self):
+        with patch('utils.usage.os.replace', side_effect=OSError('disk full')):
+            self.tracker.record('text-model', total_tokens=3)
+        self.assertEqual(self.tracker.totals()['total_tokens'], 3)
+        self.assertEqual(os.listdir(self.tmp_dir.name), [])
+
+    def test_non_object_file_is_ignored(self):
+        with open(self.path, 'w') as f:
+            f.write('[1, 2]')
+        self.assertEqual(UsageTracker(self.path).totals()['calls'], 0)
+
+
+    def test_malformed_entries_are_dropped(self):
+        today = date.today().isoformat()
+        with open(self.path, 'w') as f:
+            json.dump({
+                'totals': {'calls': 'many'},
+                'pets': {'pet_1': {'calls': 2}, 'pet_2': []},
+                'daily': {'2026-01-01': [], today: {'totals': {'calls': 1}, 'pets': {'pet_1': None}}},
+            }, f)
+        tracker = UsageTracker(self.path)
+
+        self.assertEqual(tracker.totals()['calls'], 0)
+        self.assertEqual(tracker.for_pet('pet_1')['calls'], 2)
+        self.assertEqual(tracker.for_pet('pet_2')['calls'], 0)
+        self.assertEqual(tracker.today()['images'], 0)
+        self.assertEqual(tracker.today('pet_1')['calls'], 0)
+        tracker.record('text-model', pet_id='pet_2', total_tokens=1)
+        self.assertEqual(tracker.today('pet_2')['calls'], 1)
+
+class TestModelScheduler(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.tracker = UsageTracker(path=None)
+
+    def make_scheduler(self, global_budget=None, pet_budget=None):
+        return ModelScheduler(
+            self.tracker,
+            global_budget=global_budget,
+            pet_budget=pet_budget,
+            clock=lambda: self.now,
+        )
+
+    def test_runs_call_and_returns_result(self):
+        scheduler = self.make_scheduler()
+        self.assertEqual(scheduler.run(lambda: 'ok'), 'ok')
+
+    def test_background_is_shed_before_interactive_on_rate(self):
+        scheduler = self.make_scheduler(global_budget=Budget(requests_per_minute=10))
+        for _ in range(7):
+            scheduler.run(lambda: None, priority=Priority.INTERACTIVE)
+
+        with self.assertRaises(QuotaExceededError):
+            scheduler.run(lambda: None, priority=Priority.BACKGROUND)
+        scheduler.run(lambda: None, priority=Priority.CARE)
+        scheduler.run(lambda: None, priority=Priority.INTERACTIVE)
+
+        with self.assertRaises(QuotaExceededError):
+            scheduler.run(lambda: None, priority=Priority.CARE)
+        self.assertEqual(scheduler.run(lambda: 'chat', priority=Priority.INTERACTIVE), 'chat')
+
+    def test_rate_window_expires(self):
+        scheduler = self.make_scheduler(global_budget=Budget(requests_per_minute=1))
+        scheduler.run(lambda: None)
+        with self.assertRaises(QuotaExceededError):
+            scheduler.run(lambda: None, priority=Priority.CARE)
+        self.now = 61.0
+        scheduler.run(lambda: None, priority=Priority.CARE)
+
+    def test_zero_rate_limit_sheds_interactive_calls(self):
+        scheduler = self.make_scheduler(global_budget=Budget(requests_per_minute=0))
+        with self.assertRaises(QuotaExceededError):
+            scheduler.run(lambda: None, priority=Priority.INTERACTIVE)
+
+    def test_interactive_wait_is_capped(self):
+        scheduler = ModelScheduler(
+            self.tracker, global_budget=Budget(requests_per_minute=1), max_wait=0.05)
+        waits = []
+        scheduler.run(lambda: None)
+
+        start = time.monotonic()
+        with self.assertRaises(QuotaExceededError):
+            scheduler.run(lambda: None, priority=Priority.INTERACTIVE, on_wait=waits.append)
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertEqual(waits, [0.05])
+
+    def test_waiting_calls_run_in_priority_order(self):
+        scheduler = self.make_scheduler()
+        release = threading.Event()
+        holder = threading.Thread(target=scheduler.run, args=(release.wait,))
+        holder.start()
+        self.wait_until(lambda: scheduler._active == 1)
+
+        order = []
+        threads = []
+        for priority in (Priority.BACKGROUND, Priority.CARE, Priority.INTERACTIVE):
+            thread = threading.Thread(
+                target=scheduler.run,
+                args=(lambda p=priority: order.append(p),),
+                kwargs={'priority': priority},
+            )
+            thread.start()
+            threads.append(thread)
+            self.wait_until(lambda n=len(threads): len(scheduler._waiting) == n)
+
+        release.set()
+        for thread in [holder] + threads:
+            thread.join(timeout=5)
+        self.assertEqual(order, [Priority.INTERACTIVE, Priority.CARE, Priority.BACKGROUND])
+
+    def wait_until(self, condition):
+        deadline = time.monotonic() + 5
+        while not condition():
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+
+    def test_pet_quota_does_not_affect_other_pets(self):
+        scheduler = self.make_scheduler(pet_budget=Budget(tokens_per_day=100))
+        self.tracker.record('text-model', pet_id='pet_1', total_tokens=100)
+
+        with self.assertRaises(QuotaExceededError):
+            scheduler.run(lambda: None, priority=Priority.INTERACTIVE, pet_id='pet_1')
+        self.assertEqual(scheduler.run(lambda: 'ok', pet_id='pet_2'), 'ok')
+
+    def test_image_quota_only_applies_to_images(self):
+        scheduler = self.make_scheduler(global_budget=Budget(images_per_day=3))
+        self.tracker.record('image-model', images=2)
+
+        with self.assertRaises(QuotaExceededError):
+            scheduler.run(lambda: None, priority=Priority.BACKGROUND, kind='image')
+        scheduler.run(lambda: None, priority=Priority.CARE, kind='image')
+        scheduler.run(lambda: None, priority=Priority.BACKGROUND, kind='text')
+
+
+if __name__ == '__main__':
+    unittest.main()
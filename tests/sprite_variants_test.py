@@ -0,0 +1,134 @@
+import json
+import os
+import tempfile
+import unittest
+
+from PIL import Image
+
+from utils import sprite_variants
+
+
+class TestSpriteVariants(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = self.tmp_dir.name
+        self.atlas_path = os.path.join(self.directory, 'animation_mapping.atlas')
+        for number, color in ((1, (250, 200, 40, 255)), (2, (40, 120, 250, 255))):
+            image = Image.new('RGBA', (40, 20), (0, 0, 0, 0))
+            image.paste(Image.new('RGBA', (16, 16), color), (2, 2))
+            image.paste(Image.new('RGBA', (16, 16), color), (22, 2))
+            image.save(f'{self.directory}/pet_{number}.png')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def derive(self, image_number, mood):
+        return sprite_variants.derive_variant(
+            image_number, mood, directory=self.directory, atlas_path=self.atlas_path)
+
+    def test_mood_for_statuses(self):
+        self.assertIsNone(sprite_variants.mood_for_statuses(['Healthy', 'Full']))
+        self.assertEqual(sprite_variants.mood_for_statuses(['Hungry', 'Sick']), 'sick')
+        self.assertEqual(sprite_variants.mood_for_statuses(['Sick', 'Deceased']), 'dead')
+        self.assertEqual(sprite_variants.mood_for_statuses(['Sad']), 'sad')
+
+    def test_dead_variant_is_desaturated_with_x_eyes(self):
+        path = self.derive(1, 'dead')
+        self.assertEqual(path, f'{self.directory}/pet_1_dead.png')
+        with Image.open(path) as image:
+            pixels = image.convert('RGBA')
+            self.assertEqual(pixels.getpixel((0, 0))[3], 0)
+            colors = {pixel[:3] for pixel in pixels.getdata() if pixel[3]}
+        grey = {color for color in colors if color[0] == color[1] == color[2]}
+        self.assertTrue(grey)
+        self.assertIn(sprite_variants._X_EYES_COLOR[:3], colors)
+
+    def test_variants_are_per_image_number(self):
+        first = self.derive(1, 'sad')
+        second = self.derive(2, 'sad')
+        self.assertNotEqual(first, second)
+        with Image.open(first) as a, Image.open(second) as b:
+            self.assertNotEqual(a.getpixel((5, 5)), b.getpixel((5, 5)))
+
+    def test_variant_is_cached_until_source_changes(self):
+        path = self.derive(1, 'hungry')
+        os.utime(path, (4000000000, 4000000000))
+        self.assertEqual(self.derive(1, 'hungry'), path)
+        self.assertEqual(os.path.getmtime(path), 4000000000)
+
+        os.utime(f'{self.directory}/pet_1.png', (4000000001, 4000000001))
+        self.derive(1, 'hungry')
+        self.assertNotEqual(os.path.getmtime(path), 4000000000)
+
+    def test_atlas_frames_get_their_own_stamp(self):
+        with open(self.atlas_path, 'w') as f:
+            json.dump({'C:\\pets\\pet_1.png': {'frame1': [2, 2, 16, 16], 'frame2': [22, 2, 16, 16]}}, f)
+        path = self.derive(1, 'dead')
+        with Image.open(path) as image:
+            pixels = image.convert('RGBA')
+            red = sprite_variants._X_EYES_COLOR
+            left = [x for x in range(20) for y in range(20) if pixels.getpixel((x, y)) == red]
+            right = [x for x in range(20, 40) for y in range(20) if pixels.getpixel((x, y)) == red]
+        self.assertTrue(left)
+        self.assertTrue(right)
+
+    def test_mood_covers_pixels_outside_frame_boxes(self):
+        sprite = Image.new('RGBA', (40, 20), (0, 0, 0, 0))
+        sprite.paste(Image.new('RGBA', (16, 16), (250, 200, 40, 255)), (2, 2))
+        # A tail sticking out past the atlas frame.
+        sprite.paste(Image.new('RGBA', (4, 4), (40, 220, 90, 255)), (30, 10))
+        sprite.save(f'{self.directory}/pet_4.png')
+        with open(self.atlas_path, 'w') as f:
+            json.dump({'/pets/pet_4.png': {'frame1': [2, 2, 16, 16]}}, f)
+
+        with Image.open(self.derive(4, 'dead')) as image:
+            tail = image.convert('RGBA').getpixel((31, 11))
+        self.assertEqual(tail[0], tail[1])
+        self.assertEqual(tail[1], tail[2])
+        self.assertEqual(tail[3], 255)
+
+    def test_frames_are_detected_without_atlas_entry(self):
+        # Three opaque 170x170 frames on a black background, like a generated sheet.
+        sheet = Image.new('RGBA', (600, 200), (0, 0, 0, 255))
+        for left in (10, 215, 420):
+            sheet.paste(Image.new('RGBA', (170, 170), (250, 200, 40, 255)), (left, 15))
+        sheet.save(f'{self.directory}/pet_3.png')
+        with open(self.atlas_path, 'w') as f:
+            json.dump({'/pets/pet_90.png': {'frame1': [0, 0, 10, 10]}}, f)
+
+        path = self.derive(3, 'dead')
+        with Image.open(path) as image:
+            pixels = image.convert('RGBA')
+            red = sprite_variants._X_EYES_COLOR
+            red_columns = {x for x in range(600) for y in range(200) if pixels.getpixel((x, y)) == red}
+            self.assertEqual(pixels.getpixel((5, 5)), (0, 0, 0, 255))
+        for left in (10, 215, 420):
+            self.assertTrue(any(left <= x < left + 170 for x in red_columns))
+        self.assertFalse(any(180 <= x < 215 or 385 <= x < 420 for x in red_columns))
+
+    def test_damaged_atlas_falls_back_to_detected_frames(self):
+        path = self.derive(1, 'dead')
+        with Image.open(path) as image:
+            expected = list(image.convert('RGBA').getdata())
+        os.remove(path)
+        self.assertIn(sprite_variants._X_EYES_COLOR, expected)
+
+        for content in ('{"truncated": ', '[1, 2]', '{"C:\\\\pet_1.png": {"frame1": [1, 2]}}'):
+            with open(self.atlas_path, 'w') as f:
+                f.write(content)
+            path = self.derive(1, 'dead')
+            with Image.open(path) as image:
+                pixels = list(image.convert('RGBA').getdata())
+            os.remove(path)
+            self.assertEqual(pixels, expected, content)
+            frame_pixel = pixels[5 * 40 + 5]
+            self.assertEqual(frame_pixel[0], frame_pixel[1])
+            self.assertEqual(frame_pixel[1], frame_pixel[2])
+
+    def test_unknown_mood(self):
+        with self.assertRaises(ValueError):
+            self.derive(1, 'ecstatic')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,21 +2,34 @@
 
 This module centralizes client initialization so that the rest of the codebase
 shares a single configured client instance. It also provides small helpers for
-common text and image generation tasks used across the project.
+common text and image generation tasks used across the project. Every call is
+routed through a shared :class:`~utils.scheduler.ModelScheduler` and its usage
+is recorded by a shared :class:`~utils.usage.UsageTracker`.
 """
 from __future__ import annotations
 
-from typing import Optional
+from typing import Callable, Optional
 
 from google import genai
 from google.genai import types
 
 import config
+from utils.scheduler import Budget, ModelScheduler, Priority, QuotaExceededError
+from utils.usage import UsageTracker
 
 TEXT_MODEL = "gemini-2.5-flash"
 IMAGE_MODEL = "imagen-3.0-generate-002"
 
+# Defaults used when ``config`` does not define ``GLOBAL_BUDGET`` / ``PET_BUDGET``
+# (dicts of :class:`~utils.scheduler.Budget` fields).
+DEFAULT_GLOBAL_BUDGET = {"requests_per_minute": 10, "tokens_per_day": 250_000, "images_per_day": 20}
+# No per-pet image quota: the only image call draws a brand-new pet, which has
+# no key yet, so the global ``images_per_day`` limit covers it.
+DEFAULT_PET_BUDGET = {"requests_per_minute": 6, "tokens_per_day": 100_000}
+
 _client: Optional[genai.Client] = None
+_usage_tracker: Optional[UsageTracker] = None
+_scheduler: Optional[ModelScheduler] = None
 
 
 def _ensure_api_key() -> str:
@@ -34,28 +47,80 @@ def get_client() -> genai.Client:
     return _client
 
 
-def generate_text(prompt: str, *, config_override: Optional[types.GenerateContentConfig] = None) -> str:
-    """Generate a text response for the provided prompt."""
-    response = get_client().models.generate_content(
-        model=TEXT_MODEL,
-        contents=prompt,
-        config=config_override,
+def get_usage_tracker() -> UsageTracker:
+    """Return the shared usage tracker persisted across runs."""
+    global _usage_tracker
+    if _usage_tracker is None:
+        _usage_tracker = UsageTracker()
+    return _usage_tracker
+
+
+def get_scheduler() -> ModelScheduler:
+    """Return the shared scheduler configured with the project budgets."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = ModelScheduler(
+            get_usage_tracker(),
+            global_budget=Budget(**getattr(config, "GLOBAL_BUDGET", DEFAULT_GLOBAL_BUDGET)),
+            pet_budget=Budget(**getattr(config, "PET_BUDGET", DEFAULT_PET_BUDGET)),
+        )
+    return _scheduler
+
+
+def generate_text(
+    prompt: str,
+    *,
+    config_override: Optional[types.GenerateContentConfig] = None,
+    priority: Priority = Priority.INTERACTIVE,
+    pet_id: Optional[str] = None,
+    on_wait: Optional[Callable[[float], None]] = None,
+) -> str:
+    """Generate a text response for the provided prompt.
+
+    Raises :class:`QuotaExceededError` if the scheduler sheds the call.
+    ``on_wait`` is called if the call has to wait for the rate limit.
+    """
+    response = get_scheduler().run(
+        lambda: get_client().models.generate_content(
+            model=TEXT_MODEL,
+            contents=prompt,
+            config=config_override,
+        ),
+        priority=priority,
+        pet_id=pet_id,
+        on_wait=on_wait,
     )
+    get_usage_tracker().record_response(TEXT_MODEL, response, pet_id=pet_id)
     text = (response.text or "").strip()
     if not text:
         raise RuntimeError("Gemini returned an empty response.")
     return text
 
 
-def generate_image(prompt: str, *, config_override: Optional[types.GenerateImagesConfig] = None) -> bytes:
-    """Generate an image and return the raw bytes of the first result."""
+def generate_image(
+    prompt: str,
+    *,
+    config_override: Optional[types.GenerateImagesConfig] = None,
+    priority: Priority = Priority.BACKGROUND,
+    pet_id: Optional[str] = None,
+) -> bytes:
+    """Generate an image and return the raw bytes of the first result.
+
+    Raises :class:`QuotaExceededError` if the scheduler sheds the call.
+    """
     generation_config = config_override or types.GenerateImagesConfig(number_of_images=1)
-    response = get_client().models.generate_images(
-        model=IMAGE_MODEL,
-        prompt=prompt,
-        config=generation_config,
+    response = get_scheduler().run(
+        lambda: get_client().models.generate_images(
+            model=IMAGE_MODEL,
+            prompt=prompt,
+            config=generation_config,
+        ),
+        priority=priority,
+        pet_id=pet_id,
+        kind="image",
     )
     images = response.generated_images or []
+    get_usage_tracker().record(IMAGE_MODEL, pet_id=pet_id, images=len(images))
     if not images or images[0].image is None or images[0].image.image_bytes is None:
         raise RuntimeError("Gemini did not provide image bytes.")
     return images[0].image.image_bytes
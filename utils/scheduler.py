@@ -0,0 +1,192 @@
+"""Priority and quota-aware scheduling of Gemini model calls.
+
+Calls are admitted in priority order (interactive chat first, then care
+reactions, then background work such as image generation) and are checked
+against a global and a per-pet budget. Each priority class keeps a reserve:
+when the remaining fraction of any budget drops to that reserve the call is
+shed with :class:`QuotaExceededError`, so background work goes first and
+interactive chat keeps working the longest.
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+from utils.usage import UsageTracker
+
+T = TypeVar("T")
+
+RATE_WINDOW_SECONDS = 60.0
+
+
+class Priority(IntEnum):
+    """Priority classes for model calls; lower values run first."""
+
+    INTERACTIVE = 0
+    CARE = 1
+    BACKGROUND = 2
+
+
+# Fraction of every budget that must remain for a priority class to be admitted.
+PRIORITY_RESERVES: Dict[Priority, float] = {
+    Priority.INTERACTIVE: 0.0,
+    Priority.CARE: 0.15,
+    Priority.BACKGROUND: 0.4,
+}
+
+
+class QuotaExceededError(RuntimeError):
+    """Raised when a call is shed because its budget is running low."""
+
+
+@dataclass
+class Budget:
+    """Rate and daily quota limits; ``None`` means unlimited."""
+
+    requests_per_minute: Optional[int] = None
+    tokens_per_day: Optional[int] = None
+    images_per_day: Optional[int] = None
+
+
+def _fraction_left(used: int, limit: Optional[int]) -> float:
+    if limit is None:
+        return 1.0
+    if limit <= 0:
+        return 0.0
+    return max(limit - used, 0) / limit
+
+
+class ModelScheduler:
+    """Admit model calls by priority while enforcing global and per-pet budgets."""
+
+    def __init__(
+        self,
+        tracker: UsageTracker,
+        *,
+        global_budget: Optional[Budget] = None,
+        pet_budget: Optional[Budget] = None,
+        max_concurrent: int = 1,
+        max_wait: float = RATE_WINDOW_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.tracker = tracker
+        self.global_budget = global_budget or Budget()
+        self.pet_budget = pet_budget or Budget()
+        self.max_concurrent = max_concurrent
+        self.max_wait = max_wait
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._waiting: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._active = 0
+        self._global_requests: Deque[float] = deque()
+        self._pet_requests: Dict[str, Deque[float]] = {}
+
+    def run(
+        self,
+        call: Callable[[], T],
+        *,
+        priority: Priority = Priority.INTERACTIVE,
+        pet_id: Optional[str] = None,
+        kind: str = "text",
+        on_wait: Optional[Callable[[float], None]] = None,
+    ) -> T:
+        """Run ``call`` once it is admitted; raise ``QuotaExceededError`` if shed.
+
+        ``kind`` is ``"text"`` or ``"image"`` and selects which daily quota
+        applies in addition to the request rate. Interactive calls that hit the
+        rate limit wait at most ``max_wait`` seconds; ``on_wait`` is called once
+        with the expected wait so the caller can tell the user.
+        """
+        self._acquire(priority, pet_id, kind, on_wait)
+        try:
+            return call()
+        finally:
+            with self._condition:
+                self._active -= 1
+                self._condition.notify_all()
+
+    def _acquire(
+        self,
+        priority: Priority,
+        pet_id: Optional[str],
+        kind: str,
+        on_wait: Optional[Callable[[float], None]],
+    ) -> None:
+        ticket = (int(priority), next(self._sequence))
+        deadline: Optional[float] = None
+        with self._condition:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    if self._waiting[0] == ticket and self._active < self.max_concurrent:
+                        quota_left, rate_left, retry_in = self._budget_left(pet_id, kind)
+                        reserve = PRIORITY_RESERVES[priority]
+                        if quota_left <= reserve:
+                            raise QuotaExceededError(
+                                f"Daily {kind} quota is too low for {priority.name.lower()} calls."
+                            )
+                        if rate_left > reserve:
+                            break
+                        if priority != Priority.INTERACTIVE or self._rate_disabled(pet_id):
+                            raise QuotaExceededError(
+                                f"Request rate is too high for {priority.name.lower()} calls."
+                            )
+                        # Interactive calls wait out the rate window, up to ``max_wait``.
+                        now = self._clock()
+                        if deadline is None:
+                            deadline = now + self.max_wait
+                            if on_wait is not None:
+                                on_wait(min(retry_in, self.max_wait))
+                        if now >= deadline:
+                            raise QuotaExceededError("Timed out waiting for the request rate limit.")
+                        self._condition.wait(timeout=min(retry_in, deadline - now))
+                    else:
+                        self._condition.wait()
+            except BaseException:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._condition.notify_all()
+                raise
+            heapq.heappop(self._waiting)
+            self._active += 1
+            now = self._clock()
+            self._global_requests.append(now)
+            if pet_id is not None:
+                self._pet_requests.setdefault(pet_id, deque()).append(now)
+            self._condition.notify_all()
+
+    def _rate_disabled(self, pet_id: Optional[str]) -> bool:
+        budgets = [self.global_budget] if pet_id is None else [self.global_budget, self.pet_budget]
+        return any(b.requests_per_minute is not None and b.requests_per_minute <= 0 for b in budgets)
+
+    def _budget_left(self, pet_id: Optional[str], kind: str) -> Tuple[float, float, float]:
+        """Return the smallest quota and rate fractions left and the seconds until a rate slot frees."""
+        counter, limit_name = ("images", "images_per_day") if kind == "image" else ("total_tokens", "tokens_per_day")
+        scopes = [(self.global_budget, self._global_requests, self.tracker.today())]
+        if pet_id is not None:
+            scopes.append(
+                (
+                    self.pet_budget,
+                    self._pet_requests.setdefault(pet_id, deque()),
+                    self.tracker.today(pet_id),
+                )
+            )
+
+        now = self._clock()
+        quota_left = rate_left = 1.0
+        retry_in = RATE_WINDOW_SECONDS
+        for budget, requests, usage in scopes:
+            while requests and now - requests[0] >= RATE_WINDOW_SECONDS:
+                requests.popleft()
+            quota_left = min(quota_left, _fraction_left(usage[counter], getattr(budget, limit_name)))
+            rate_left = min(rate_left, _fraction_left(len(requests), budget.requests_per_minute))
+            if requests:
+                retry_in = min(retry_in, RATE_WINDOW_SECONDS - (now - requests[0]))
+        return quota_left, rate_left, max(retry_in, 0.01)
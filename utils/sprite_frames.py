@@ -0,0 +1,65 @@
+"""Locate the individual frames of a pet sprite sheet.
+
+Generated sheets have a black background, so each frame is a connected
+component of pixels brighter than ``LUMINANCE_THRESHOLD``. Components whose
+bounding box is too small (stray pixels) or too large (the whole sheet) are
+discarded.
+"""
+from __future__ import annotations
+
+from collections import deque
+from typing import List, Tuple
+
+from PIL import Image
+
+LUMINANCE_THRESHOLD = 20
+MIN_FRAME_AREA = 25000
+MAX_FRAME_AREA = 230000
+
+Box = Tuple[int, int, int, int]
+
+
+def detect_frames(
+    image: Image.Image,
+    *,
+    min_area: int = MIN_FRAME_AREA,
+    max_area: int = MAX_FRAME_AREA,
+) -> List[Box]:
+    """Return ``(left, top, right, bottom)`` frame boxes sorted from left to right."""
+    grayscale = image.convert("L")
+    width, height = grayscale.size
+    pixels = grayscale.load()
+    mask = [[pixels[x, y] > LUMINANCE_THRESHOLD for x in range(width)] for y in range(height)]
+
+    visited = [[False] * width for _ in range(height)]
+    boxes = []
+    for y in range(height):
+        for x in range(width):
+            if not mask[y][x] or visited[y][x]:
+                continue
+            queue = deque([(x, y)])
+            visited[y][x] = True
+            min_x = max_x = x
+            min_y = max_y = y
+            while queue:
+                cx, cy = queue.popleft()
+                if cx < min_x:
+                    min_x = cx
+                if cx > max_x:
+                    max_x = cx
+                if cy < min_y:
+                    min_y = cy
+                if cy > max_y:
+                    max_y = cy
+                for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                    nx, ny = cx + dx, cy + dy
+                    if 0 <= nx < width and 0 <= ny < height and mask[ny][nx] and not visited[ny][nx]:
+                        visited[ny][nx] = True
+                        queue.append((nx, ny))
+
+            bounding_area = (max_x - min_x + 1) * (max_y - min_y + 1)
+            if min_area < bounding_area < max_area:
+                boxes.append((min_x, min_y, max_x + 1, max_y + 1))
+
+    boxes.sort(key=lambda box: box[0])
+    return boxes
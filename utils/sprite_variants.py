@@ -0,0 +1,138 @@
+"""Derive mood variants of a pet sprite locally with Pillow.
+
+Instead of asking the image model for a new picture whenever the pet dies or
+its status changes, the variants are derived from the pet's own sprite frames
+(desaturation, colour overlays and an X-eyes stamp for the dead variant). Each
+variant is cached on disk per image number as ``pet_<n>_<mood>.png`` next to
+the original sprite and is only rebuilt when the original changes.
+"""
+from __future__ import annotations
+
+import json
+import os
+from typing import Iterable, List, Optional
+
+from PIL import Image, ImageDraw, ImageEnhance
+
+from utils import sprite_frames
+
+SPRITE_DIRECTORY = "assets/pet_animations"
+ATLAS_PATH = "utils/data/animation_mapping.atlas"
+
+MOODS = ("dead", "sick", "sad", "hungry")
+
+# Status -> mood, in order of precedence when several statuses are active.
+STATUS_MOODS = (
+    ("Deceased", "dead"),
+    ("Sick", "sick"),
+    ("Hungry", "hungry"),
+    ("Sad", "sad"),
+)
+
+# Mood -> (saturation, brightness, overlay colour, overlay strength).
+_MOOD_STYLES = {
+    "dead": (0.0, 0.8, None, 0.0),
+    "sick": (0.5, 0.95, (90, 200, 60), 0.35),
+    "sad": (0.4, 0.85, (60, 90, 200), 0.3),
+    "hungry": (0.7, 0.9, (230, 150, 40), 0.25),
+}
+
+_X_EYES_COLOR = (220, 30, 30, 255)
+
+Box = sprite_frames.Box
+
+
+def mood_for_statuses(statuses: Iterable[str]) -> Optional[str]:
+    """Return the mood variant matching ``statuses`` or ``None`` for the normal sprite."""
+    active = set(statuses or [])
+    for status, mood in STATUS_MOODS:
+        if status in active:
+            return mood
+    return None
+
+
+def get_variant_path(image_number: int, mood: str, directory: str = SPRITE_DIRECTORY) -> str:
+    return f"{directory}/pet_{image_number}_{mood}.png"
+
+
+def derive_variant(
+    image_number: int,
+    mood: str,
+    *,
+    directory: str = SPRITE_DIRECTORY,
+    atlas_path: str = ATLAS_PATH,
+) -> str:
+    """Return the path of the ``mood`` variant of pet ``image_number``, building it if needed."""
+    if mood not in _MOOD_STYLES:
+        raise ValueError(f"Unknown sprite mood: {mood}")
+    source_path = f"{directory}/pet_{image_number}.png"
+    variant_path = get_variant_path(image_number, mood, directory)
+    if os.path.exists(variant_path) and os.path.getmtime(variant_path) >= os.path.getmtime(source_path):
+        return variant_path
+
+    with Image.open(source_path) as source:
+        image = _apply_mood(source.convert("RGBA"), mood)
+    if mood == "dead":
+        # Frames only place the stamps; the mood itself covers the whole sheet.
+        draw = ImageDraw.Draw(image)
+        for box in _frame_boxes(image, image_number, atlas_path):
+            _stamp_x_eyes(draw, box)
+    image.save(variant_path)
+    return variant_path
+
+
+def _frame_boxes(image: Image.Image, image_number: int, atlas_path: str) -> List[Box]:
+    """Return the frame boxes for the sprite, from the atlas when it describes this image.
+
+    The atlas only keeps the most recently generated pet, so other sprites have
+    their frames detected the same way the atlas was built.
+    """
+    width, height = image.size
+    if os.path.exists(atlas_path):
+        try:
+            boxes = _atlas_boxes(atlas_path, image_number, height)
+        except (ValueError, TypeError, AttributeError):
+            # A damaged atlas must not break status rendering or game over.
+            boxes = []
+        if boxes:
+            return boxes
+    return sprite_frames.detect_frames(image) or [image.getbbox() or (0, 0, width, height)]
+
+
+def _atlas_boxes(atlas_path: str, image_number: int, height: int) -> List[Box]:
+    with open(atlas_path, encoding="utf-8") as file:
+        atlas = json.load(file)
+    for path, frames in atlas.items():
+        # Atlas keys are absolute paths written on whichever OS generated them.
+        if path.replace("\\", "/").rsplit("/", 1)[-1] != f"pet_{image_number}.png":
+            continue
+        boxes = []
+        for x, y, w, h in frames.values():
+            # Atlas rows are measured from the bottom of the image.
+            top = height - y - h
+            boxes.append((x, top, x + w, top + h))
+        return boxes
+    return []
+
+
+def _apply_mood(image: Image.Image, mood: str) -> Image.Image:
+    saturation, brightness, overlay, strength = _MOOD_STYLES[mood]
+    alpha = image.getchannel("A")
+    rgb = image.convert("RGB")
+    rgb = ImageEnhance.Color(rgb).enhance(saturation)
+    rgb = ImageEnhance.Brightness(rgb).enhance(brightness)
+    if overlay is not None:
+        rgb = Image.blend(rgb, Image.new("RGB", rgb.size, overlay), strength)
+    rgb.putalpha(alpha)
+    return rgb
+
+
+def _stamp_x_eyes(draw: ImageDraw.ImageDraw, box: Box) -> None:
+    left, top, right, bottom = box
+    width, height = right - left, bottom - top
+    size = max(2, int(min(width, height) * 0.08))
+    line_width = max(1, size // 3)
+    eye_y = top + int(height * 0.4)
+    for eye_x in (left + int(width * 0.35), left + int(width * 0.65)):
+        draw.line((eye_x - size, eye_y - size, eye_x + size, eye_y + size), fill=_X_EYES_COLOR, width=line_width)
+        draw.line((eye_x - size, eye_y + size, eye_x + size, eye_y - size), fill=_X_EYES_COLOR, width=line_width)
@@ -0,0 +1,177 @@
+"""Token and image accounting for Gemini model calls.
+
+Every call made through :mod:`utils.gemini_client` is recorded here and
+aggregated globally, per pet, per model and per day. The aggregates are
+persisted to a small JSON file next to the save file so quotas survive
+restarts.
+"""
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import date
+from typing import Any, Dict, Optional
+
+USAGE_FILE = "usage_stats.json"
+DAILY_HISTORY_DAYS = 7
+
+logger = logging.getLogger(__name__)
+
+_COUNTERS = ("calls", "prompt_tokens", "output_tokens", "total_tokens", "images")
+
+
+def _empty_counters() -> Dict[str, int]:
+    return {name: 0 for name in _COUNTERS}
+
+
+def _clean_counters(value: Any) -> Optional[Dict[str, int]]:
+    """Return ``value`` as a full set of counters, or ``None`` if it is malformed."""
+    if not isinstance(value, dict):
+        return None
+    counters = _empty_counters()
+    for name in _COUNTERS:
+        count = value.get(name, 0)
+        if not isinstance(count, int):
+            return None
+        counters[name] = count
+    return counters
+
+
+def _clean_counter_map(value: Any) -> Dict[str, Dict[str, int]]:
+    """Keep only the well-formed counter entries of a ``{key: counters}`` mapping."""
+    if not isinstance(value, dict):
+        return {}
+    cleaned = {}
+    for key, counters in value.items():
+        counters = _clean_counters(counters)
+        if counters is not None:
+            cleaned[key] = counters
+    return cleaned
+
+
+def _add(counters: Dict[str, int], delta: Dict[str, int]) -> None:
+    for name in _COUNTERS:
+        counters[name] = counters.get(name, 0) + delta.get(name, 0)
+
+
+class UsageTracker:
+    """Aggregate model usage and persist it to ``path``."""
+
+    def __init__(self, path: Optional[str] = USAGE_FILE) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = self._load()
+
+    def _load(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"totals": _empty_counters(), "pets": {}, "models": {}, "daily": {}}
+        if not self.path or not os.path.exists(self.path):
+            return data
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                stored = json.load(file)
+        except (OSError, ValueError):
+            # A corrupt stats file should never prevent the game from starting.
+            return data
+        if not isinstance(stored, dict):
+            return data
+        # Drop malformed entries so a damaged file cannot break quota checks.
+        data["totals"] = _clean_counters(stored.get("totals")) or data["totals"]
+        data["pets"] = _clean_counter_map(stored.get("pets"))
+        data["models"] = _clean_counter_map(stored.get("models"))
+        daily = stored.get("daily")
+        for day_key, day in (daily.items() if isinstance(daily, dict) else ()):
+            if not isinstance(day, dict) or not isinstance(day.get("pets"), dict):
+                continue
+            totals = _clean_counters(day.get("totals"))
+            if totals is not None:
+                data["daily"][day_key] = {"totals": totals, "pets": _clean_counter_map(day["pets"])}
+        return data
+
+    def _save(self) -> None:
+        """Write the stats atomically; a failed save never loses the model response."""
+        if not self.path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        tmp_path = None
+        try:
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=directory, suffix=".tmp", delete=False
+            ) as file:
+                tmp_path = file.name
+                json.dump(self._data, file, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            logger.warning("Could not save usage stats to %s", self.path, exc_info=True)
+            if tmp_path is not None:
+                with contextlib.suppress(OSError):
+                    os.remove(tmp_path)
+
+    def record(
+        self,
+        model: str,
+        *,
+        pet_id: Optional[str] = None,
+        prompt_tokens: int = 0,
+        output_tokens: int = 0,
+        total_tokens: Optional[int] = None,
+        images: int = 0,
+        day: Optional[date] = None,
+    ) -> None:
+        """Record a single completed model call."""
+        delta = {
+            "calls": 1,
+            "prompt_tokens": prompt_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": total_tokens if total_tokens is not None else prompt_tokens + output_tokens,
+            "images": images,
+        }
+        day_key = (day or date.today()).isoformat()
+        with self._lock:
+            _add(self._data["totals"], delta)
+            _add(self._data["models"].setdefault(model, _empty_counters()), delta)
+            daily = self._data["daily"].setdefault(day_key, {"totals": _empty_counters(), "pets": {}})
+            _add(daily["totals"], delta)
+            if pet_id is not None:
+                _add(self._data["pets"].setdefault(pet_id, _empty_counters()), delta)
+                _add(daily["pets"].setdefault(pet_id, _empty_counters()), delta)
+            for stale in sorted(self._data["daily"])[:-DAILY_HISTORY_DAYS]:
+                del self._data["daily"][stale]
+            self._save()
+
+    def record_response(self, model: str, response: Any, *, pet_id: Optional[str] = None) -> None:
+        """Record a ``generate_content`` response using its ``usage_metadata``."""
+        metadata = getattr(response, "usage_metadata", None)
+        self.record(
+            model,
+            pet_id=pet_id,
+            prompt_tokens=getattr(metadata, "prompt_token_count", None) or 0,
+            output_tokens=getattr(metadata, "candidates_token_count", None) or 0,
+            total_tokens=getattr(metadata, "total_token_count", None),
+        )
+
+    def totals(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._data["totals"])
+
+    def for_pet(self, pet_id: str) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._data["pets"].get(pet_id, _empty_counters()))
+
+    def for_model(self, model: str) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._data["models"].get(model, _empty_counters()))
+
+    def today(self, pet_id: Optional[str] = None, *, day: Optional[date] = None) -> Dict[str, int]:
+        """Return today's usage, globally or for ``pet_id``."""
+        day_key = (day or date.today()).isoformat()
+        with self._lock:
+            daily = self._data["daily"].get(day_key)
+            if daily is None:
+                return _empty_counters()
+            if pet_id is None:
+                return dict(daily["totals"])
+            return dict(daily["pets"].get(pet_id, _empty_counters()))